@@ -2,20 +2,72 @@
 Demo data generator for 3D printing platform scheduling.
 Generates realistic medical case data for testing the scheduler.
 """
-import random
-import pandas as pd
+import csv
+import functools
+from collections import Counter
+import numpy as np
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+
+# Inclusive shipping lead-time bounds per priority index: rush, fast, standard
+_SHIPPING_LOW = np.array([1, 3, 7], dtype=np.int64)
+_SHIPPING_HIGH = np.array([3, 7, 14], dtype=np.int64)
+
+def _draw_shipping_days(prio_idx: np.ndarray, draws: np.ndarray) -> np.ndarray:
+    """Map uniform draws in [0, 1) to integer shipping days for each case's priority."""
+    low = _SHIPPING_LOW[prio_idx]
+    return low + (draws * (_SHIPPING_HIGH[prio_idx] - low + 1)).astype(np.int64)
+
+# Field order of the arrays returned by _draw_case_arrays / _cached_batch
+_CASE_ARRAY_FIELDS = ("device_idx", "prio_idx", "days_ahead", "first_idx", "last_idx", "shipping_days")
+
+def _draw_case_arrays(rng: np.random.Generator, num_cases: int, num_devices: int,
+                      priority_weights, num_first_names: int, num_last_names: int) -> Dict[str, np.ndarray]:
+    """Draw the random fields of a case batch from the given generator."""
+    prio_idx = rng.choice(len(priority_weights), size=num_cases, p=priority_weights)
+    arrays = {
+        "device_idx": rng.integers(0, num_devices, num_cases),
+        "prio_idx": prio_idx,
+        "days_ahead": rng.integers(5, 91, num_cases),
+        "first_idx": rng.integers(0, num_first_names, num_cases),
+        "last_idx": rng.integers(0, num_last_names, num_cases),
+    }
+    
+    # Rush (1-3), fast (3-7) or standard (7-14) shipping depending on priority
+    arrays["shipping_days"] = _draw_shipping_days(prio_idx, rng.random(num_cases))
+    return arrays
+
+@functools.lru_cache(maxsize=8)
+def _cached_batch(seed: int, num_cases: int, num_devices: int, priority_weights: Tuple[float, ...],
+                  num_first_names: int, num_last_names: int) -> Tuple[np.ndarray, ...]:
+    """Memoized draws for a seeded batch, returned as read-only arrays in _CASE_ARRAY_FIELDS order."""
+    arrays = _draw_case_arrays(np.random.default_rng(seed), num_cases, num_devices,
+                               priority_weights, num_first_names, num_last_names)
+    for array in arrays.values():
+        array.setflags(write=False)
+    return tuple(arrays[field] for field in _CASE_ARRAY_FIELDS)
 
 class MedicalCaseDataGenerator:
     """Generate realistic medical case data for 3D printing scheduling."""
     
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None):
+        """
+        Initialize the generator.
+        
+        Args:
+            seed: Seed for the random number generator; None for fresh entropy
+        """
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        
         self.device_types = [
             "hip_replacement", "shoulder_implant", "knee_component", 
             "skull_plate", "facial_reconstruction", "spinal_implant",
             "jaw_reconstruction", "orbital_implant", "custom_prosthetic"
         ]
+        # Case ID prefixes, aligned index-for-index with device_types
+        self.device_codes = np.array(["HIP", "SHO", "KNE", "SKL", "FAC", "SPI", "JAW", "ORB", "CUS"])
+        self.device_code_map = dict(zip(self.device_types, self.device_codes.tolist()))
         
         self.priorities = ["emergency", "urgent", "standard"]
         self.priority_weights = [0.05, 0.15, 0.80]  # 5% emergency, 15% urgent, 80% standard
@@ -39,24 +91,13 @@ class MedicalCaseDataGenerator:
     
     def generate_patient_name(self) -> str:
         """Generate a random patient name."""
-        first = random.choice(self.first_names)
-        last = random.choice(self.last_names)
+        first = self.first_names[self.rng.integers(len(self.first_names))]
+        last = self.last_names[self.rng.integers(len(self.last_names))]
         return f"{first} {last}"
     
     def generate_case_id(self, device_type: str, case_number: int) -> str:
         """Generate a case ID based on device type and number."""
-        device_code = {
-            "hip_replacement": "HIP",
-            "shoulder_implant": "SHO", 
-            "knee_component": "KNE",
-            "skull_plate": "SKL",
-            "facial_reconstruction": "FAC",
-            "spinal_implant": "SPI",
-            "jaw_reconstruction": "JAW",
-            "orbital_implant": "ORB",
-            "custom_prosthetic": "CUS"
-        }
-        code = device_code.get(device_type, "DEV")
+        code = self.device_code_map.get(device_type, "DEV")
         return f"{code}{case_number:03d}"
     
     def calculate_due_date(self, surgery_date: datetime, shipping_days: int = 10) -> datetime:
@@ -69,20 +110,20 @@ class MedicalCaseDataGenerator:
             base_date = datetime.now()
         
         # Generate surgery date 5-90 days from base date (more future-focused)
-        days_ahead = random.randint(5, 90)
+        days_ahead = int(self.rng.integers(5, 91))
         surgery_date = base_date + timedelta(days=days_ahead)
         
         # Select device type and priority
-        device_type = random.choice(self.device_types)
-        priority = random.choices(self.priorities, weights=self.priority_weights)[0]
+        device_type = self.device_types[self.rng.integers(len(self.device_types))]
+        priority = self.priorities[self.rng.choice(len(self.priorities), p=self.priority_weights)]
         
         # Adjust shipping lead time based on priority
         if priority == "emergency":
-            shipping_days = random.randint(1, 3)  # Rush delivery
+            shipping_days = int(self.rng.integers(1, 4))  # Rush delivery
         elif priority == "urgent":
-            shipping_days = random.randint(3, 7)   # Fast delivery
+            shipping_days = int(self.rng.integers(3, 8))   # Fast delivery
         else:
-            shipping_days = random.randint(7, 14)  # Standard delivery
+            shipping_days = int(self.rng.integers(7, 15))  # Standard delivery
         
         due_date = self.calculate_due_date(surgery_date, shipping_days)
         
@@ -100,54 +141,132 @@ class MedicalCaseDataGenerator:
         
         return case
     
-    def generate_case_batch(self, num_cases: int, base_date: datetime = None) -> List[Dict[str, Any]]:
-        """Generate a batch of medical cases."""
+    def generate_case_arrays(self, num_cases: int) -> Dict[str, np.ndarray]:
+        """
+        Draw the random fields of a case batch as parallel numpy arrays.
+        
+        Args:
+            num_cases: Number of cases to draw
+            
+        Returns:
+            Dictionary of index arrays into device_types, priorities, first_names
+            and last_names, plus days_ahead and shipping_days
+        """
+        return _draw_case_arrays(self.rng, num_cases, len(self.device_types), self.priority_weights,
+                                 len(self.first_names), len(self.last_names))
+    
+    def _generate_cases(self, num_cases: int, base_date: datetime = None,
+                        first_case_number: int = 1,
+                        arrays: Optional[Dict[str, np.ndarray]] = None) -> List[Dict[str, Any]]:
+        """Generate cases with all random fields drawn up front as numpy arrays."""
+        if base_date is None:
+            base_date = datetime.now()
+        
+        if arrays is None:
+            arrays = self.generate_case_arrays(num_cases)
+        device_idx = arrays["device_idx"]
+        prio_idx = arrays["prio_idx"]
+        days_ahead = arrays["days_ahead"]
+        first_idx = arrays["first_idx"]
+        last_idx = arrays["last_idx"]
+        shipping_days = arrays["shipping_days"]
+        
+        # Surgery and due dates as day-resolution datetime64, formatted in one C pass
+        surgery_np = np.datetime64(base_date, 'D') + days_ahead.astype('timedelta64[D]')
+        due_np = surgery_np - shipping_days.astype('timedelta64[D]')
+        surgery_strs = np.datetime_as_string(surgery_np, unit='D').tolist()
+        due_strs = np.datetime_as_string(due_np, unit='D').tolist()
+        
+        # Case IDs built with vectorized string ops: device code + zero-padded number
+        numbers = np.arange(first_case_number, first_case_number + num_cases)
+        case_ids = np.char.add(self.device_codes[device_idx], np.char.mod("%03d", numbers)).tolist()
+        
+        # Notes such as "Urgent skull plate case", composed column-wise
+        prio_labels = np.char.capitalize(np.array(self.priorities))
+        device_labels = np.char.replace(np.array(self.device_types), '_', ' ')
+        notes = np.char.add(np.char.add(prio_labels[prio_idx], " "),
+                            np.char.add(device_labels[device_idx], " case")).tolist()
+        
         cases = []
-        for i in range(1, num_cases + 1):
-            case = self.generate_single_case(i, base_date)
-            cases.append(case)
+        for i, (d, pr, first, last, ship) in enumerate(zip(
+                device_idx.tolist(), prio_idx.tolist(),
+                first_idx.tolist(), last_idx.tolist(), shipping_days.tolist())):
+            device_type = self.device_types[d]
+            priority = self.priorities[pr]
+            cases.append({
+                "case_id": case_ids[i],
+                "patient_name": f"{self.first_names[first]} {self.last_names[last]}",
+                "device_type": device_type,
+                "priority": priority,
+                "surgery_date": surgery_strs[i],
+                "due_date": due_strs[i],
+                "shipping_days": ship,
+                "platform_time_hours": 16,  # Standard platform time
+                "notes": notes[i]
+            })
+        
         return cases
     
+    def generate_case_batch(self, num_cases: int, base_date: datetime = None) -> List[Dict[str, Any]]:
+        """
+        Generate a batch of medical cases.
+        
+        With a seeded generator the batch is drawn from a sub-seed taken from the
+        instance stream and memoized, so successive calls stay independent while a
+        generator rebuilt with the same seed reproduces the sequence without redrawing.
+        """
+        arrays = None
+        if self.seed is not None:
+            batch_seed = int(self.rng.integers(2**63))
+            cached = _cached_batch(batch_seed, num_cases, len(self.device_types), tuple(self.priority_weights),
+                                   len(self.first_names), len(self.last_names))
+            arrays = dict(zip(_CASE_ARRAY_FIELDS, cached))
+        return self._generate_cases(num_cases, base_date, arrays=arrays)
+    
     def generate_multiple_platforms(self, num_platforms: int, cases_per_platform: int = 14) -> List[Dict[str, Any]]:
         """Generate cases for multiple platforms."""
-        all_cases = []
-        case_counter = 1
+        all_cases = [None] * (num_platforms * cases_per_platform)
+        idx = 0
         
         for platform in range(num_platforms):
             base_date = datetime.now() + timedelta(days=platform * 2)  # Stagger platform start dates
-            platform_cases = []
+            platform_cases = self._generate_cases(cases_per_platform, base_date, idx + 1)
             
-            for case in range(cases_per_platform):
-                case_data = self.generate_single_case(case_counter, base_date)
-                case_data["suggested_platform"] = f"Platform_{platform + 1:02d}"
-                platform_cases.append(case_data)
-                case_counter += 1
-            
-            all_cases.extend(platform_cases)
+            suggested_platform = f"Platform_{platform + 1:02d}"
+            for case_data in platform_cases:
+                case_data["suggested_platform"] = suggested_platform
+                all_cases[idx] = case_data
+                idx += 1
         
         return all_cases
     
     def export_to_csv(self, cases: List[Dict[str, Any]], filename: str = "demo_medical_cases.csv"):
-        """Export cases to CSV file."""
-        df = pd.DataFrame(cases)
-        df.to_csv(filename, index=False)
+        """Export cases to CSV file, streaming rows without building a DataFrame."""
+        fieldnames = list(cases[0].keys()) if cases else []
+        with open(filename, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames, lineterminator='\n')
+            writer.writeheader()
+            writer.writerows(cases)
         print(f"Exported {len(cases)} cases to {filename}")
-        return df
     
     def get_sample_printer_config(self, num_printers: int = 50) -> Dict[str, Any]:
         """Get sample printer configuration."""
         # Generate some fake maintenance windows
-        maintenance_windows = []
-        base_date = datetime.now()
-        for week in range(4):  # Next 4 weeks
-            maintenance_date = base_date + timedelta(weeks=week, days=6)  # Every Sunday
-            start_time = maintenance_date.replace(hour=6, minute=0)
-            end_time = start_time + timedelta(hours=6)  # 6-hour maintenance window
-            maintenance_windows.append({
-                "start": start_time.strftime("%Y-%m-%d %H:%M"),
-                "end": end_time.strftime("%Y-%m-%d %H:%M"),
-                "printers_affected": random.randint(1, 5)  # 1-5 printers down
-            })
+        weeks = np.arange(4)  # Next 4 weeks
+        days = np.datetime64(datetime.now(), 'D') + (weeks * 7 + 6).astype('timedelta64[D]')  # Every Sunday
+        starts = days.astype('datetime64[m]') + np.timedelta64(6, 'h')
+        ends = starts + np.timedelta64(6, 'h')  # 6-hour maintenance window
+        start_strs = np.char.replace(np.datetime_as_string(starts, unit='m'), 'T', ' ').tolist()
+        end_strs = np.char.replace(np.datetime_as_string(ends, unit='m'), 'T', ' ').tolist()
+        maintenance_windows = [
+            {
+                "start": start,
+                "end": end,
+                "printers_affected": affected  # 1-5 printers down
+            }
+            for start, end, affected in zip(start_strs, end_strs,
+                                            self.rng.integers(1, 6, len(start_strs)).tolist())
+        ]
         
         return {
             "total_printers": num_printers,
@@ -168,13 +287,14 @@ def main():
     cases = generator.generate_multiple_platforms(num_platforms=5, cases_per_platform=14)
     
     # Export to CSV
-    df = generator.export_to_csv(cases, "demo_medical_cases.csv")
+    generator.export_to_csv(cases, "demo_medical_cases.csv")
     
-    # Display summary
+    # Display summary (ISO date strings sort chronologically)
+    surgery_dates = [c['surgery_date'] for c in cases]
     print(f"\nGenerated {len(cases)} medical cases:")
-    print(f"- Device types: {df['device_type'].value_counts().to_dict()}")
-    print(f"- Priorities: {df['priority'].value_counts().to_dict()}")
-    print(f"- Date range: {df['surgery_date'].min()} to {df['surgery_date'].max()}")
+    print(f"- Device types: {dict(Counter(c['device_type'] for c in cases).most_common())}")
+    print(f"- Priorities: {dict(Counter(c['priority'] for c in cases).most_common())}")
+    print(f"- Date range: {min(surgery_dates)} to {max(surgery_dates)}")
     
     # Get printer configuration
     printer_config = generator.get_sample_printer_config()
@@ -2,12 +2,83 @@
 3D Printing Platform Scheduler for Medical Devices
 Uses Google OR-Tools CP-SAT solver for optimized scheduling.
 """
+import csv
+import heapq
+import os
+import numpy as np
 import pandas as pd
+from collections import Counter, defaultdict
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
 from ortools.sat.python import cp_model
 import json
 
+try:
+    from ciso8601 import parse_datetime as _parse_iso_datetime
+except ImportError:  # ciso8601 is optional; fall back to strptime
+    _parse_iso_datetime = None
+
+def _parse_schedule_time(value: str) -> datetime:
+    """Parse a "%Y-%m-%d %H:%M" schedule timestamp, using ciso8601 when available."""
+    if _parse_iso_datetime is not None:
+        return _parse_iso_datetime(value)
+    return datetime.strptime(value, "%Y-%m-%d %H:%M")
+
+def _greedy_schedule(due_sec: np.ndarray, num_printers: int, cycle_time: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Earliest-due-date list schedule used to warm-start the solver.
+    
+    Args:
+        due_sec: Earliest due date of each platform, in epoch seconds
+        num_printers: Number of available printers
+        cycle_time: Hours a printer is busy per platform, including turnaround
+        
+    Returns:
+        (start hour, printer) arrays indexed by platform
+    """
+    order = np.argsort(due_sec, kind='stable')
+    
+    # Min-heap of (time printer becomes free, printer id); all free at hour 0
+    free_printers = [(0, r) for r in range(num_printers)]
+    start = np.empty(len(order), dtype=np.int64)
+    printer = np.empty(len(order), dtype=np.int64)
+    for p in order.tolist():
+        free_at, r = heapq.heappop(free_printers)
+        start[p] = free_at
+        printer[p] = r
+        heapq.heappush(free_printers, (free_at + cycle_time, r))
+    return start, printer
+
+# Scheduling rank of each priority level; unknown priorities sort last
+PRIORITY_ORDER = {"emergency": 0, "urgent": 1, "standard": 2}
+UNKNOWN_PRIORITY = 3
+
+# Column order of the detailed case-by-case schedule export
+DETAILED_SCHEDULE_FIELDS = [
+    'case_id', 'patient_name', 'device_type', 'priority', 'surgery_date', 'due_date',
+    'assigned_platform', 'assigned_printer', 'print_start_time', 'print_complete_time',
+    'platform_duration_hours', 'shipping_days_required', 'days_buffer_before_surgery',
+    'days_buffer_before_due_date', 'delivery_status', 'risk_level',
+]
+
+def _platform_times(platform: Dict[str, Any]) -> Tuple[datetime, datetime]:
+    """Return a scheduled platform's (start, end) datetimes, parsing them only for JSON-loaded solutions."""
+    start_dt = platform.get('start_dt')
+    end_dt = platform.get('end_dt')
+    if not isinstance(start_dt, datetime) or not isinstance(end_dt, datetime):
+        start_dt = _parse_schedule_time(platform['start_time'])
+        end_dt = _parse_schedule_time(platform['end_time'])
+    return start_dt, end_dt
+
+class PlatformAgg(NamedTuple):
+    """Cases grouped onto one platform, with the aggregates the model reads."""
+    cases: List[Dict[str, Any]]
+    earliest_due: datetime
+    n_emergency: int
+    n_urgent: int
+    earliest_emergency_due: Optional[datetime]
+    earliest_urgent_due: Optional[datetime]
+
 class PlatformScheduler:
     """
     3D Printing Platform Scheduler for medical device manufacturing.
@@ -43,11 +114,19 @@ class PlatformScheduler:
         self.model = None
         self.solver = None
         self.solution = None
+        self.schedule_start = None   # Reference time that model start hours are relative to
+        self.solve_wall_time = 0.0   # Total wall time across both solve phases
+        self.priority_penalty = None # Best tardiness/due-date penalty found in phase 1
+        
+        # Objective terms, optimized lexicographically by solve_schedule()
+        self.priority_objective = None
+        self.max_completion = None
         
         # Decision variables
         self.platform_vars = {}      # Platform assignment variables
         self.start_time_vars = {}    # Platform start time variables
         self.printer_vars = {}       # Printer assignment variables
+        self.printer_choice_vars = {}  # Assigned printer index per platform
         
         print(f"PlatformScheduler initialized:")
         print(f"- {self.config['total_printers']} printers available")
@@ -57,17 +136,16 @@ class PlatformScheduler:
     def load_cases_from_csv(self, filename: str) -> List[Dict[str, Any]]:
         """Load medical cases from CSV file."""
         df = pd.read_csv(filename)
-        cases = df.to_dict('records')
         
-        # Convert date strings to datetime objects
-        for case in cases:
-            case['surgery_date'] = datetime.strptime(case['surgery_date'], '%Y-%m-%d')
-            case['due_date'] = datetime.strptime(case['due_date'], '%Y-%m-%d')
+        # Convert date columns in one vectorized pass (Timestamps are datetime subclasses)
+        for column in ('surgery_date', 'due_date'):
+            df[column] = pd.to_datetime(df[column], format='%Y-%m-%d', cache=True)
+        cases = df.to_dict('records')
         
         print(f"Loaded {len(cases)} medical cases from {filename}")
         return cases
     
-    def create_platforms(self, cases: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    def create_platforms(self, cases: List[Dict[str, Any]]) -> List[PlatformAgg]:
         """
         Group cases into platforms of optimal size.
         
@@ -75,27 +153,48 @@ class PlatformScheduler:
             cases: List of medical cases
             
         Returns:
-            List of platforms, each containing up to cases_per_platform cases
+            List of platforms, each holding up to cases_per_platform cases together
+            with its earliest due dates and priority counts
         """
-        # Sort cases by priority and due date
-        priority_order = {"emergency": 0, "urgent": 1, "standard": 2}
+        # Rank priorities as ints once, alongside the cases rather than inside them
+        ranked = sorted(
+            ((PRIORITY_ORDER.get(case['priority'], UNKNOWN_PRIORITY), case) for case in cases),
+            key=lambda item: (item[0], item[1]['due_date'])
+        )
         
-        sorted_cases = sorted(cases, key=lambda x: (
-            priority_order.get(x['priority'], 3),
-            x['due_date']
-        ))
+        # Sort cases by priority and due date
+        ranks = [rank for rank, _ in ranked]
+        sorted_cases = [case for _, case in ranked]
         
         platforms = []
         cases_per_platform = self.config['cases_per_platform']
+        emergency = PRIORITY_ORDER['emergency']
+        urgent = PRIORITY_ORDER['urgent']
         
         for i in range(0, len(sorted_cases), cases_per_platform):
             platform_cases = sorted_cases[i:i + cases_per_platform]
-            platforms.append(platform_cases)
+            platform_ranks = ranks[i:i + cases_per_platform]
+            
+            # Cases are sorted by due date within each priority, so the first case
+            # seen for a priority carries that priority's earliest due date
+            counts = Counter(platform_ranks)
+            earliest_by_priority = {}
+            for rank, case in zip(platform_ranks, platform_cases):
+                earliest_by_priority.setdefault(rank, case['due_date'])
+            
+            platforms.append(PlatformAgg(
+                cases=platform_cases,
+                earliest_due=min(earliest_by_priority.values()),
+                n_emergency=counts.get(emergency, 0),
+                n_urgent=counts.get(urgent, 0),
+                earliest_emergency_due=earliest_by_priority.get(emergency),
+                earliest_urgent_due=earliest_by_priority.get(urgent),
+            ))
         
         print(f"Created {len(platforms)} platforms from {len(cases)} cases")
         return platforms
     
-    def build_scheduling_model(self, platforms: List[List[Dict[str, Any]]]) -> cp_model.CpModel:
+    def build_scheduling_model(self, platforms: List[PlatformAgg]) -> cp_model.CpModel:
         """
         Build the CP-SAT constraint programming model.
         
@@ -107,6 +206,10 @@ class PlatformScheduler:
         """
         model = cp_model.CpModel()
         
+        # Read the clock once so every due-date offset shares the same reference
+        now = datetime.now()
+        self.schedule_start = now
+        
         num_platforms = len(platforms)
         num_printers = self.config['total_printers']
         platform_duration = self.config['platform_duration_hours']
@@ -115,6 +218,10 @@ class PlatformScheduler:
         # Planning horizon in hours
         horizon_hours = self.config['planning_horizon_days'] * 24
         
+        # Back-to-back on a single printer, every platform can start within this bound,
+        # so it is a valid (and usually much tighter) upper bound than the full horizon
+        start_upper_bound = min(horizon_hours, num_platforms * (platform_duration + turnaround_time))
+        
         print(f"Building model: {num_platforms} platforms, {num_printers} printers, {horizon_hours}h horizon")
         
         # Decision variables
@@ -124,50 +231,70 @@ class PlatformScheduler:
             for r in range(num_printers):
                 self.printer_vars[(p, r)] = model.NewBoolVar(f'platform_{p}_printer_{r}')
         
+        # Integer variable: index of the printer platform p runs on, channeled so that
+        # printer_choice == r exactly when printer_vars[(p, r)] is true
+        self.printer_choice_vars = {}
+        for p in range(num_platforms):
+            self.printer_choice_vars[p] = model.NewIntVar(0, num_printers - 1, f'printer_choice_{p}')
+            model.add_map_domain(self.printer_choice_vars[p],
+                               [self.printer_vars[(p, r)] for r in range(num_printers)])
+        
         # Integer variable: start time of platform p (in hours from now)
         self.start_time_vars = {}
         for p in range(num_platforms):
-            self.start_time_vars[p] = model.NewIntVar(0, horizon_hours, f'start_time_{p}')
+            self.start_time_vars[p] = model.NewIntVar(0, start_upper_bound, f'start_time_{p}')
+        
+        # Completion time of each platform, shared by every constraint that needs it.
+        # The duration stays a literal: CP-SAT folds it into the constraint bounds,
+        # whereas a NewConstant variable would add a term to each constraint.
+        completion_times = [self.start_time_vars[p] + platform_duration for p in range(num_platforms)]
+        completion_upper_bound = start_upper_bound + platform_duration
         
         # CONSTRAINTS
         
         # 1. Each platform must be assigned to exactly one printer
         for p in range(num_platforms):
-            model.Add(sum(self.printer_vars[(p, r)] for r in range(num_printers)) == 1)
+            model.AddExactlyOne([self.printer_vars[(p, r)] for r in range(num_printers)])
+        
+        # Symmetry breaking: printers are interchangeable, so pin platform 0 to printer 0
+        # and order the remaining printers by how many platforms they run
+        if num_platforms > 0:
+            model.Add(self.printer_vars[(0, 0)] == 1)
+        for r in range(2, num_printers):
+            model.Add(
+                sum(self.printer_vars[(p, r)] for p in range(num_platforms)) <=
+                sum(self.printer_vars[(p, r - 1)] for p in range(num_platforms))
+            )
+        
+        # Branch on printer assignments first, in platform order
+        model.AddDecisionStrategy(
+            [self.printer_vars[(p, r)] for p in range(num_platforms) for r in range(num_printers)],
+            cp_model.CHOOSE_FIRST, cp_model.SELECT_MIN_VALUE)
         
         # 2. No two platforms can overlap on the same printer
+        # Each (platform, printer) pair gets an optional interval that is only present
+        # when the platform runs on that printer; CP-SAT's native disjunctive
+        # propagator then keeps the present intervals on each printer apart.
+        cycle_time = platform_duration + turnaround_time
+        intervals = {}
+        for p in range(num_platforms):
+            for r in range(num_printers):
+                end_var = model.NewIntVar(0, start_upper_bound + cycle_time, f'end_{p}_{r}')
+                intervals[(p, r)] = model.NewOptionalIntervalVar(
+                    self.start_time_vars[p], cycle_time, end_var,
+                    self.printer_vars[(p, r)], f'interval_{p}_{r}')
+        
         for r in range(num_printers):
-            for p1 in range(num_platforms):
-                for p2 in range(p1 + 1, num_platforms):
-                    # If both platforms assigned to same printer, they can't overlap
-                    # Platform p1 ends before p2 starts OR p2 ends before p1 starts
-                    
-                    # Big M constraint for non-overlapping
-                    big_m = horizon_hours
-                    
-                    # If both assigned to printer r
-                    both_assigned = model.NewBoolVar(f'both_assigned_{p1}_{p2}_{r}')
-                    model.Add(self.printer_vars[(p1, r)] + self.printer_vars[(p2, r)] <= 1 + both_assigned)
-                    model.Add(both_assigned <= self.printer_vars[(p1, r)])
-                    model.Add(both_assigned <= self.printer_vars[(p2, r)])
-                    
-                    # Non-overlap constraint when both assigned to same printer
-                    model.Add(
-                        self.start_time_vars[p1] + platform_duration + turnaround_time <= 
-                        self.start_time_vars[p2] + big_m * (1 - both_assigned)
-                    ).OnlyEnforceIf(both_assigned)
-                    
-                    model.Add(
-                        self.start_time_vars[p2] + platform_duration + turnaround_time <= 
-                        self.start_time_vars[p1] + big_m * (1 - both_assigned)
-                    ).OnlyEnforceIf(both_assigned)
+            model.AddNoOverlap([intervals[(p, r)] for p in range(num_platforms)])
+        
+        # Hours from now until each platform's earliest, emergency and urgent due dates,
+        # computed in one vectorized pass (a missing class falls back to the earliest due date)
+        due_hours = self._hours_until_due(platforms, now).tolist()
         
         # 3. Due date constraints (soft constraints with penalties)
         due_date_penalties = []
-        for p, platform_cases in enumerate(platforms):
-            # Find the earliest due date in this platform
-            earliest_due = min(case['due_date'] for case in platform_cases)
-            hours_until_due = int((earliest_due - datetime.now()).total_seconds() / 3600)
+        for p, platform in enumerate(platforms):
+            hours_until_due = due_hours[p][0]
             
             # If due date is in the past, give a reasonable buffer (24 hours)
             if hours_until_due < 0:
@@ -175,54 +302,128 @@ class PlatformScheduler:
                 print(f"⚠️  Platform {p} has past due date, using 24h buffer")
             
             # Soft constraint: penalize if platform completes after due date
-            completion_time = self.start_time_vars[p] + platform_duration
-            lateness = model.NewIntVar(0, horizon_hours, f'lateness_{p}')
-            model.Add(lateness >= completion_time - hours_until_due)
+            lateness = model.NewIntVarFromDomain(
+                cp_model.Domain(0, completion_upper_bound), f'lateness_{p}')
+            model.Add(lateness >= completion_times[p] - hours_until_due)
             
             # Weight penalty based on platform priority
-            emergency_cases = sum(1 for case in platform_cases if case['priority'] == 'emergency')
-            urgent_cases = sum(1 for case in platform_cases if case['priority'] == 'urgent')
-            
-            penalty_weight = emergency_cases * 1000 + urgent_cases * 100 + 10
+            penalty_weight = platform.n_emergency * 1000 + platform.n_urgent * 100 + 10
             due_date_penalties.append(penalty_weight * lateness)
         
         # OBJECTIVES
         
         # Primary: Minimize maximum completion time (makespan)
-        max_completion = model.NewIntVar(0, horizon_hours, 'max_completion')
-        for p in range(num_platforms):
-            completion_time = self.start_time_vars[p] + platform_duration
-            model.Add(max_completion >= completion_time)
+        max_completion = model.NewIntVar(0, completion_upper_bound, 'max_completion')
+        model.AddMaxEquality(max_completion, completion_times)
         
         # Secondary: Minimize total tardiness for priority cases
+        # All cases on a platform complete together, so each priority class gets one
+        # tardiness variable against its earliest due date, weighted by its case count
         tardiness_penalties = []
-        for p, platform_cases in enumerate(platforms):
-            for case in platform_cases:
-                if case['priority'] in ['emergency', 'urgent']:
-                    due_hours = int((case['due_date'] - datetime.now()).total_seconds() / 3600)
-                    completion_time = self.start_time_vars[p] + platform_duration
-                    
-                    tardiness = model.NewIntVar(0, horizon_hours, f'tardiness_{p}_{case["case_id"]}')
-                    model.Add(tardiness >= completion_time - due_hours)
-                    
-                    weight = 100 if case['priority'] == 'emergency' else 10
-                    tardiness_penalties.append(weight * tardiness)
+        for p, platform in enumerate(platforms):
+            for priority, weight, count, class_due_hours in (
+                ('emergency', 100, platform.n_emergency, due_hours[p][1]),
+                ('urgent', 10, platform.n_urgent, due_hours[p][2]),
+            ):
+                if not count:
+                    continue
+                
+                # Bounded by the latest possible completion rather than the full horizon,
+                # which also keeps long-overdue cases feasible
+                tardiness = model.NewIntVar(0, max(0, completion_upper_bound - class_due_hours),
+                                            f'tardiness_{priority}_{p}')
+                model.Add(tardiness >= completion_times[p] - class_due_hours)
+                
+                tardiness_penalties.append(weight * count * tardiness)
         
-        # Combined objective: minimize makespan + weighted tardiness + due date penalties
+        # Lexicographic objective: solve_schedule() first minimizes weighted tardiness +
+        # due date penalties, then minimizes makespan with that penalty held fixed.
+        # Solving the two separately avoids mixing terms several orders of magnitude apart.
         total_tardiness = sum(tardiness_penalties) if tardiness_penalties else 0
         total_due_date_penalty = sum(due_date_penalties) if due_date_penalties else 0
-        model.Minimize(max_completion + total_tardiness + total_due_date_penalty)
+        self.priority_objective = total_tardiness + total_due_date_penalty
+        self.max_completion = max_completion
+        model.Minimize(self.priority_objective)
+        
+        # Warm start from a greedy schedule
+        self._add_greedy_hint(model, platforms)
         
         self.model = model
         print(f"Model built with {len(self.printer_vars)} printer assignment variables")
         return model
     
-    def solve_schedule(self, time_limit_seconds: int = 300) -> bool:
+    @staticmethod
+    def _hours_until_due(platforms: List[PlatformAgg], now: datetime) -> np.ndarray:
         """
-        Solve the scheduling optimization problem.
+        Whole hours from now until each platform's due dates.
         
         Args:
-            time_limit_seconds: Maximum solving time
+            platforms: List of platforms with cases
+            now: Reference time the model's start hours are measured from
+            
+        Returns:
+            int64 array of shape (num_platforms, 3) with the earliest, earliest emergency
+            and earliest urgent due date of each platform, truncated toward zero like int()
+        """
+        due_dates = pd.to_datetime([
+            due if due is not None else platform.earliest_due
+            for platform in platforms
+            for due in (platform.earliest_due, platform.earliest_emergency_due, platform.earliest_urgent_due)
+        ])
+        hours = (due_dates - pd.Timestamp(now)).total_seconds().to_numpy() / 3600
+        return hours.astype(np.int64).reshape(-1, 3)
+    
+    def _add_greedy_hint(self, model: cp_model.CpModel, platforms: List[PlatformAgg]):
+        """
+        Seed the solver with a greedy earliest-due-date schedule.
+        
+        Platforms are taken in due-date order and each goes to the printer that
+        frees up first. Printers are then relabeled so the hint satisfies the
+        symmetry-breaking constraints (platform 0 on printer 0, remaining printers
+        ordered by platform count).
+        
+        Args:
+            model: Model to add the hints to
+            platforms: List of platforms with cases
+        """
+        num_printers = self.config['total_printers']
+        cycle_time = self.config['platform_duration_hours'] + self.config['turnaround_hours']
+        if not platforms:
+            return
+        
+        due_sec = np.fromiter((platform.earliest_due.timestamp() for platform in platforms),
+                              dtype=np.int64, count=len(platforms))
+        starts, assigned = _greedy_schedule(due_sec, num_printers, cycle_time)
+        
+        counts = np.bincount(assigned, minlength=num_printers)
+        first_printer = int(assigned[0])
+        others = sorted((r for r in range(num_printers) if r != first_printer), key=lambda r: -counts[r])
+        relabel = {r: label for label, r in enumerate([first_printer] + others)}
+        
+        for p, (start, r) in enumerate(zip(starts.tolist(), assigned.tolist())):
+            model.AddHint(self.start_time_vars[p], start)
+            chosen = relabel[r]
+            model.AddHint(self.printer_choice_vars[p], chosen)
+            for printer in range(num_printers):
+                model.AddHint(self.printer_vars[(p, printer)], printer == chosen)
+    
+    def solve_schedule(self, time_limit_seconds: int = 300,
+                       num_workers: Optional[int] = None,
+                       linearization_level: int = 1,
+                       use_combined_no_overlap: bool = False) -> bool:
+        """
+        Solve the scheduling optimization problem lexicographically.
+        
+        Phase 1 minimizes the weighted tardiness and due date penalty. Phase 2 keeps
+        that penalty at or below its phase 1 value, warm-starts from the phase 1
+        solution and minimizes the makespan. Half the time limit goes to phase 1 and
+        phase 2 gets whatever remains; if nothing remains, the phase 1 schedule is kept.
+        
+        Args:
+            time_limit_seconds: Maximum total solving time across both phases
+            num_workers: Parallel CP-SAT portfolio workers (defaults to the CPU count)
+            linearization_level: CP-SAT LP relaxation level (0-2)
+            use_combined_no_overlap: Reason over all printer no-overlap constraints together
             
         Returns:
             True if solution found, False otherwise
@@ -230,12 +431,54 @@ class PlatformScheduler:
         if not self.model:
             raise ValueError("Model not built. Call build_scheduling_model() first.")
         
-        solver = cp_model.CpSolver()
-        solver.parameters.max_time_in_seconds = time_limit_seconds
-        solver.parameters.log_search_progress = True
+        def new_solver(time_limit: float) -> cp_model.CpSolver:
+            solver = cp_model.CpSolver()
+            solver.parameters.max_time_in_seconds = time_limit
+            solver.parameters.log_search_progress = True
+            solver.parameters.num_workers = num_workers or os.cpu_count() or 8
+            solver.parameters.linearization_level = linearization_level
+            solver.parameters.use_combined_no_overlap = use_combined_no_overlap
+            return solver
         
         print(f"Solving with {time_limit_seconds}s time limit...")
+        
+        # Phase 1: best achievable priority penalty
+        self.model.Minimize(self.priority_objective)
+        solver = new_solver(time_limit_seconds / 2)
         status = solver.Solve(self.model)
+        self.solve_wall_time = solver.WallTime()
+        
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            self.priority_penalty = round(solver.ObjectiveValue())
+            print(f"   Phase 1 ({solver.StatusName(status)}): priority penalty {self.priority_penalty}")
+            
+            # Phase 2 gets whatever phase 1 left of the total time limit
+            remaining_time = time_limit_seconds - self.solve_wall_time
+            if remaining_time <= 0:
+                print(f"⚠️  No time left for the makespan phase, keeping phase 1 schedule")
+            else:
+                # Phase 2: hold the penalty, warm-start from phase 1 and minimize makespan
+                response = solver.ResponseProto()
+                self.model.Add(self.priority_objective <= self.priority_penalty)
+                self.model.ClearHints()
+                hint = self.model.Proto().solution_hint
+                hint.vars[:] = range(len(response.solution))
+                hint.values[:] = response.solution
+                self.model.Minimize(self.max_completion)
+                
+                phase2_solver = new_solver(remaining_time)
+                phase2_status = phase2_solver.Solve(self.model)
+                self.solve_wall_time += phase2_solver.WallTime()
+                
+                if phase2_status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                    print(f"   Phase 2 ({phase2_solver.StatusName(phase2_status)}): "
+                          f"makespan {round(phase2_solver.ObjectiveValue())}h")
+                    # Only report OPTIMAL when both phases proved optimality
+                    if status == cp_model.OPTIMAL:
+                        status = phase2_status
+                    solver = phase2_solver
+                else:
+                    print(f"⚠️  Makespan phase found no solution, keeping phase 1 schedule")
         
         self.solver = solver
         
@@ -249,7 +492,7 @@ class PlatformScheduler:
             print(f"❌ No solution found. Status: {solver.StatusName(status)}")
             return False
     
-    def extract_solution(self, platforms: List[List[Dict[str, Any]]]) -> Dict[str, Any]:
+    def extract_solution(self, platforms: List[PlatformAgg]) -> Dict[str, Any]:
         """
         Extract and format the solution results.
         
@@ -262,60 +505,66 @@ class PlatformScheduler:
         if not self.solver:
             raise ValueError("No solution available. Call solve_schedule() first.")
         
+        # Read all variable values from the response at once, indexed by var.Index()
+        values = list(self.solver.ResponseProto().solution)
+        
+        # Evaluate both objective terms on the returned schedule, whichever phase it came from
+        makespan = values[self.max_completion.Index()]
+        priority_penalty = self.solver.Value(self.priority_objective)
+        
         solution = {
             "status": "success",
-            "objective_value": self.solver.ObjectiveValue(),
-            "solve_time_seconds": self.solver.WallTime(),
+            # Makespan + weighted tardiness + due date penalties of the schedule
+            "objective_value": makespan + priority_penalty,
+            "makespan_hours": makespan,
+            "priority_penalty": priority_penalty,
+            "solve_time_seconds": self.solve_wall_time,
             "platform_assignments": [],
             "printer_utilization": {},
             "summary": {}
         }
         
+        # Start hours are relative to the time the model was built
+        now = self.schedule_start
+        
         # Extract platform assignments
-        for p, platform_cases in enumerate(platforms):
-            start_time_hours = self.solver.Value(self.start_time_vars[p])
-            start_datetime = datetime.now() + timedelta(hours=start_time_hours)
+        for p, platform in enumerate(platforms):
+            platform_cases = platform.cases
+            start_time_hours = values[self.start_time_vars[p].Index()]
+            start_datetime = now + timedelta(hours=start_time_hours)
             end_datetime = start_datetime + timedelta(hours=self.config['platform_duration_hours'])
             
-            # Find assigned printer
-            assigned_printer = None
-            for r in range(self.config['total_printers']):
-                if self.solver.Value(self.printer_vars[(p, r)]) == 1:
-                    assigned_printer = r
-                    break
+            assigned_printer = values[self.printer_choice_vars[p].Index()]
             
             platform_info = {
                 "platform_id": p,
                 "assigned_printer": assigned_printer,
                 "start_time": start_datetime.strftime("%Y-%m-%d %H:%M"),
                 "end_time": end_datetime.strftime("%Y-%m-%d %H:%M"),
+                "start_dt": start_datetime,
+                "end_dt": end_datetime,
                 "duration_hours": self.config['platform_duration_hours'],
                 "num_cases": len(platform_cases),
                 "cases": platform_cases,
-                "priority_breakdown": {}
+                "priority_breakdown": dict(Counter(case['priority'] for case in platform_cases))
             }
             
-            # Analyze priority breakdown
-            for case in platform_cases:
-                priority = case['priority']
-                platform_info['priority_breakdown'][priority] = \
-                    platform_info['priority_breakdown'].get(priority, 0) + 1
-            
             solution["platform_assignments"].append(platform_info)
         
         # Calculate printer utilization
-        printer_usage = {}
+        printer_usage = defaultdict(list)
         for p, platform_info in enumerate(solution["platform_assignments"]):
-            printer = platform_info["assigned_printer"]
-            if printer not in printer_usage:
-                printer_usage[printer] = []
-            printer_usage[printer].append({
+            printer_usage[platform_info["assigned_printer"]].append({
                 "platform_id": p,
                 "start": platform_info["start_time"],
                 "end": platform_info["end_time"]
             })
         
-        solution["printer_utilization"] = printer_usage
+        # Present each printer's platforms in run order
+        for timeline in printer_usage.values():
+            timeline.sort(key=lambda entry: entry["start"])
+        
+        solution["printer_utilization"] = dict(printer_usage)
         
         # Generate summary statistics
         total_cases = sum(len(p_info["cases"]) for p_info in solution["platform_assignments"])
@@ -328,7 +577,7 @@ class PlatformScheduler:
             "printer_utilization_rate": f"{(printers_used / self.config['total_printers']) * 100:.1f}%",
             "avg_cases_per_platform": f"{total_cases / len(platforms):.1f}",
             "planning_horizon_hours": max([
-                (datetime.strptime(p["end_time"], "%Y-%m-%d %H:%M") - datetime.now()).total_seconds() / 3600
+                (p["end_dt"] - now).total_seconds() / 3600
                 for p in solution["platform_assignments"]
             ])
         }
@@ -425,14 +674,13 @@ class PlatformScheduler:
         
         # Create timeline
         timeline_hours = []
-        base_time = datetime.strptime(platforms[0]['start_time'], "%Y-%m-%d %H:%M")
+        base_time, _ = _platform_times(platforms[0])
         
         print(f"{'Printer':>8} | {'Platform':>8} | {'Timeline (Hours from Start)':^60} | {'Cases':>5}")
         print("-" * 100)
         
         for platform in platforms:
-            start_dt = datetime.strptime(platform['start_time'], "%Y-%m-%d %H:%M")
-            end_dt = datetime.strptime(platform['end_time'], "%Y-%m-%d %H:%M")
+            start_dt, end_dt = _platform_times(platform)
             
             start_offset = int((start_dt - base_time).total_seconds() / 3600)
             duration = int((end_dt - start_dt).total_seconds() / 3600)
@@ -460,7 +708,7 @@ class PlatformScheduler:
         print(f"\n📋 Legend:")
         print(f"   █ = Platform running  . = Idle time")
         print(f"   E = Emergency cases, U = Urgent cases, S = Standard cases")
-        print(f"   Timeline shows {((datetime.strptime(platforms[-1]['end_time'], '%Y-%m-%d %H:%M') - base_time).total_seconds() / 3600):.0f} hours from start")
+        print(f"   Timeline shows {((_platform_times(platforms[-1])[1] - base_time).total_seconds() / 3600):.0f} hours from start")
     
     def export_detailed_schedule(self, solution: Optional[Dict[str, Any]] = None, 
                                 filename: str = "detailed_schedule.csv"):
@@ -472,70 +720,62 @@ class PlatformScheduler:
             print("No solution available to export.")
             return
         
-        # Flatten all case data with comprehensive schedule information
-        detailed_data = []
+        # Stream case rows straight to disk instead of collecting them into a DataFrame
+        total_count = 0
+        on_time_count = 0
         
-        for platform in solution['platform_assignments']:
-            platform_start = datetime.strptime(platform['start_time'], "%Y-%m-%d %H:%M")
-            platform_end = datetime.strptime(platform['end_time'], "%Y-%m-%d %H:%M")
+        with open(filename, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=DETAILED_SCHEDULE_FIELDS, lineterminator='\n')
+            writer.writeheader()
             
-            for case in platform['cases']:
-                # Handle datetime objects or strings
-                surgery_date_str = case['surgery_date']
-                due_date_str = case['due_date']
-                
-                if isinstance(surgery_date_str, datetime):
-                    surgery_date = surgery_date_str
-                    surgery_date_display = surgery_date.strftime("%Y-%m-%d")
-                else:
-                    surgery_date = datetime.strptime(str(surgery_date_str).split()[0], "%Y-%m-%d")
-                    surgery_date_display = str(surgery_date_str).split()[0]
-                
-                if isinstance(due_date_str, datetime):
-                    due_date = due_date_str
-                    due_date_display = due_date.strftime("%Y-%m-%d")
-                else:
-                    due_date = datetime.strptime(str(due_date_str).split()[0], "%Y-%m-%d")
-                    due_date_display = str(due_date_str).split()[0]
+            for platform in solution['platform_assignments']:
+                _, platform_end = _platform_times(platform)
+                platform_end_date = platform_end.date()
                 
-                days_before_surgery = (surgery_date - platform_end).days
-                days_before_due = (due_date.date() - platform_end.date()).days
-                on_time = due_date.date() >= platform_end.date()
-                
-                case_detail = {
-                    'case_id': case['case_id'],
-                    'patient_name': case['patient_name'],
-                    'device_type': case['device_type'],
-                    'priority': case['priority'],
-                    'surgery_date': surgery_date_display,
-                    'due_date': due_date_display,
-                    'assigned_platform': f"Platform_{platform['platform_id']}",
-                    'assigned_printer': f"Printer_{platform['assigned_printer']}",
-                    'print_start_time': platform['start_time'],
-                    'print_complete_time': platform['end_time'],
-                    'platform_duration_hours': platform['duration_hours'],
-                    'shipping_days_required': case['shipping_days'],
-                    'days_buffer_before_surgery': days_before_surgery,
-                    'days_buffer_before_due_date': days_before_due,
-                    'delivery_status': 'ON_TIME' if on_time else 'LATE',
-                    'risk_level': 'HIGH' if days_before_due < 5 else 'MEDIUM' if days_before_due < 10 else 'LOW'
-                }
-                detailed_data.append(case_detail)
-        
-        # Export to CSV
-        df = pd.DataFrame(detailed_data)
-        df.to_csv(filename, index=False)
+                for case in platform['cases']:
+                    # Case dates are Timestamps when loaded from CSV; only solutions
+                    # reloaded from JSON carry them as strings
+                    surgery_date = case['surgery_date']
+                    due_date = case['due_date']
+                    if not isinstance(surgery_date, datetime):
+                        surgery_date = pd.Timestamp(surgery_date)
+                    if not isinstance(due_date, datetime):
+                        due_date = pd.Timestamp(due_date)
+                    
+                    days_before_surgery = (surgery_date - platform_end).days
+                    days_before_due = (due_date.date() - platform_end_date).days
+                    on_time = due_date.date() >= platform_end_date
+                    
+                    case_detail = {
+                        'case_id': case['case_id'],
+                        'patient_name': case['patient_name'],
+                        'device_type': case['device_type'],
+                        'priority': case['priority'],
+                        'surgery_date': surgery_date.strftime("%Y-%m-%d"),
+                        'due_date': due_date.strftime("%Y-%m-%d"),
+                        'assigned_platform': f"Platform_{platform['platform_id']}",
+                        'assigned_printer': f"Printer_{platform['assigned_printer']}",
+                        'print_start_time': platform['start_time'],
+                        'print_complete_time': platform['end_time'],
+                        'platform_duration_hours': platform['duration_hours'],
+                        'shipping_days_required': case['shipping_days'],
+                        'days_buffer_before_surgery': days_before_surgery,
+                        'days_buffer_before_due_date': days_before_due,
+                        'delivery_status': 'ON_TIME' if on_time else 'LATE',
+                        'risk_level': 'HIGH' if days_before_due < 5 else 'MEDIUM' if days_before_due < 10 else 'LOW'
+                    }
+                    writer.writerow(case_detail)
+                    
+                    total_count += 1
+                    on_time_count += on_time
         
         print(f"\n📊 Detailed case schedule exported to {filename}")
-        print(f"   - {len(detailed_data)} cases with complete schedule details")
+        print(f"   - {total_count} cases with complete schedule details")
         
         # Quick analysis
-        on_time_count = sum(1 for case in detailed_data if case['delivery_status'] == 'ON_TIME')
-        on_time_rate = (on_time_count / len(detailed_data)) * 100
+        on_time_rate = (on_time_count / total_count) * 100 if total_count else 0.0
         
-        print(f"   - On-time delivery rate: {on_time_rate:.1f}% ({on_time_count}/{len(detailed_data)})")
-        
-        return df
+        print(f"   - On-time delivery rate: {on_time_rate:.1f}% ({on_time_count}/{total_count})")
     
     def export_platform_summary(self, solution: Optional[Dict[str, Any]] = None,
                                filename: str = "platform_summary.csv"):
@@ -681,9 +921,14 @@ def main():
         # Export all CSV reports
         scheduler.export_all_reports(solution)
         
-        # Save solution to file
+        # Save solution to file, without the in-memory start_dt/end_dt datetimes
+        # (start_time/end_time already carry the published times)
+        published = {**solution, "platform_assignments": [
+            {key: value for key, value in platform.items() if key not in ('start_dt', 'end_dt')}
+            for platform in solution['platform_assignments']
+        ]}
         with open("scheduling_solution.json", "w") as f:
-            json.dump(solution, f, indent=2, default=str)
+            json.dump(published, f, indent=2, default=str)
         print(f"\n💾 Solution saved to scheduling_solution.json")
     else:
         print("❌ Could not find a feasible schedule.")